@@ -0,0 +1,131 @@
+//! In-memory store of analyses whose translation failed.
+//!
+//! When the translation step fails, the source-language analysis is kept so
+//! that retrying the same request only repeats the translation. Entries are
+//! taken rather than copied, so each analysis is reused at most once and
+//! fresh requests (including "Regenerate") always call the model.
+
+use std::collections::HashMap;
+use std::hash::{DefaultHasher, Hash, Hasher};
+use std::sync::{LazyLock, Mutex};
+use std::time::{Duration, Instant};
+
+use crate::config::ModelPreset;
+
+/// How long a kept analysis waits for a retry.
+const CACHE_TTL: Duration = Duration::from_secs(600);
+
+/// Maximum number of kept analyses.
+const MAX_ENTRIES: usize = 256;
+
+/// Kept analysis with its insertion time.
+struct CacheEntry {
+    response: String,
+    created_at: Instant,
+}
+
+/// Global analysis store, keyed by request hash.
+static CACHE: LazyLock<Mutex<HashMap<u64, CacheEntry>>> =
+    LazyLock::new(|| Mutex::new(HashMap::new()));
+
+/// Compute the key for an analysis request to the preset's model.
+pub fn cache_key(preset: &ModelPreset, system: &str, user: &str) -> u64 {
+    let mut hasher = DefaultHasher::new();
+    (
+        &preset.api.api_url,
+        &preset.model,
+        system,
+        user,
+        preset.max_tokens,
+        preset.thinking.as_ref().map(|t| format!("{t:?}")),
+    )
+        .hash(&mut hasher);
+    hasher.finish()
+}
+
+/// Remove and return a kept analysis if present and not expired.
+pub fn take(key: u64) -> Option<String> {
+    let mut cache = CACHE.lock().unwrap();
+    cache
+        .remove(&key)
+        .filter(|entry| entry.created_at.elapsed() < CACHE_TTL)
+        .map(|entry| entry.response)
+}
+
+/// Keep an analysis, dropping expired entries and the oldest one when full.
+pub fn insert(key: u64, response: String) {
+    let mut cache = CACHE.lock().unwrap();
+    cache.retain(|_, entry| entry.created_at.elapsed() < CACHE_TTL);
+
+    if cache.len() >= MAX_ENTRIES
+        && let Some(oldest) = cache
+            .iter()
+            .min_by_key(|(_, entry)| entry.created_at)
+            .map(|(key, _)| *key)
+    {
+        cache.remove(&oldest);
+    }
+
+    cache.insert(
+        key,
+        CacheEntry {
+            response,
+            created_at: Instant::now(),
+        },
+    );
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    /// Serializes tests that share the global store.
+    static TEST_LOCK: Mutex<()> = Mutex::new(());
+
+    #[test]
+    fn test_take_returns_entry_once() {
+        let _guard = TEST_LOCK.lock().unwrap();
+        insert(1, "analysis".to_string());
+        assert_eq!(take(1).as_deref(), Some("analysis"));
+        assert_eq!(take(1), None);
+    }
+
+    #[test]
+    fn test_expired_entry_is_not_returned() {
+        let _guard = TEST_LOCK.lock().unwrap();
+        let Some(created_at) = Instant::now().checked_sub(CACHE_TTL) else {
+            return;
+        };
+        CACHE.lock().unwrap().insert(
+            2,
+            CacheEntry {
+                response: "stale".to_string(),
+                created_at,
+            },
+        );
+        assert_eq!(take(2), None);
+    }
+
+    #[test]
+    fn test_oldest_entry_is_evicted_when_full() {
+        let _guard = TEST_LOCK.lock().unwrap();
+        let Some(created_at) = Instant::now().checked_sub(Duration::from_secs(1)) else {
+            return;
+        };
+        CACHE.lock().unwrap().clear();
+        CACHE.lock().unwrap().insert(
+            3,
+            CacheEntry {
+                response: "oldest".to_string(),
+                created_at,
+            },
+        );
+        for key in 100..100 + MAX_ENTRIES as u64 {
+            insert(key, "analysis".to_string());
+        }
+
+        assert_eq!(CACHE.lock().unwrap().len(), MAX_ENTRIES);
+        assert_eq!(take(3), None);
+        assert!(take(100 + MAX_ENTRIES as u64 - 1).is_some());
+    }
+}
@@ -34,4 +34,47 @@ pub enum AnalysisError {
     /// Invalid model ID
     #[error("Invalid model: {0}")]
     InvalidModel(String),
+
+    /// No call slot freed up in time, or the endpoint's circuit breaker is open
+    #[error("AI service is temporarily unavailable. Please try again in a minute.")]
+    ServiceUnavailable,
+}
+
+impl AnalysisError {
+    /// Whether the error is transient and the request is worth retrying.
+    pub fn is_retryable(&self) -> bool {
+        match self {
+            Self::Request(_) => true,
+            Self::ApiError { status, .. } => {
+                matches!(status, 429 | 500 | 502 | 503 | 504 | 529)
+            }
+            _ => false,
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn api_error(status: u16) -> AnalysisError {
+        AnalysisError::ApiError {
+            status,
+            body: String::new(),
+        }
+    }
+
+    #[test]
+    fn test_is_retryable() {
+        assert!(AnalysisError::Request("connection reset".to_string()).is_retryable());
+        assert!(api_error(429).is_retryable());
+        assert!(api_error(503).is_retryable());
+        assert!(api_error(529).is_retryable());
+
+        assert!(!api_error(400).is_retryable());
+        assert!(!api_error(401).is_retryable());
+        assert!(!AnalysisError::EmptyResponse.is_retryable());
+        assert!(!AnalysisError::UnsafeInput.is_retryable());
+        assert!(!AnalysisError::ServiceUnavailable.is_retryable());
+    }
 }
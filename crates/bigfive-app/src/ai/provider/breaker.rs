@@ -0,0 +1,154 @@
+//! Per-endpoint circuit breaker.
+//!
+//! After repeated transient failures an endpoint (provider, URL and model) is
+//! marked open and calls to it fail fast for a cooldown period instead of
+//! queueing behind retries. Once the cooldown ends, a single trial call is let
+//! through; its outcome closes the circuit or opens it again.
+
+use std::collections::HashMap;
+use std::sync::{LazyLock, Mutex};
+use std::time::{Duration, Instant};
+
+use tracing::warn;
+
+use crate::ai::error::AnalysisError;
+use crate::config::ApiConfig;
+
+/// Consecutive failed calls after which an endpoint's circuit opens.
+const FAILURE_THRESHOLD: u32 = 5;
+
+/// How long an open circuit rejects calls before letting a single trial call through.
+const COOLDOWN: Duration = Duration::from_secs(30);
+
+/// Breaker state for one endpoint.
+#[derive(Default)]
+struct BreakerState {
+    failures: u32,
+    open_until: Option<Instant>,
+    trial_in_flight: bool,
+}
+
+/// Global breaker states, keyed by endpoint.
+static BREAKERS: LazyLock<Mutex<HashMap<String, BreakerState>>> =
+    LazyLock::new(|| Mutex::new(HashMap::new()));
+
+/// Get the breaker key for a model behind an API endpoint.
+///
+/// Models sharing a gateway (e.g. OpenRouter) fail independently, so each
+/// gets its own circuit.
+pub fn endpoint_key(api: &ApiConfig, model: &str) -> String {
+    format!(
+        "{:?}|{}|{}",
+        api.provider,
+        api.api_url.as_deref().unwrap_or_default(),
+        model
+    )
+}
+
+/// Fail fast if the endpoint's circuit is open.
+///
+/// The first call after the cooldown becomes the trial call: the circuit is
+/// re-armed for another cooldown, so concurrent calls keep failing fast until
+/// the trial's outcome is recorded.
+pub fn check(endpoint: &str) -> Result<(), AnalysisError> {
+    let mut breakers = BREAKERS.lock().unwrap();
+    let Some(state) = breakers.get_mut(endpoint) else {
+        return Ok(());
+    };
+    let Some(open_until) = state.open_until else {
+        return Ok(());
+    };
+
+    let now = Instant::now();
+    if now < open_until {
+        return Err(AnalysisError::ServiceUnavailable);
+    }
+    state.open_until = Some(now + COOLDOWN);
+    state.trial_in_flight = true;
+    Ok(())
+}
+
+/// Record a successful call, closing the endpoint's circuit.
+pub fn record_success(endpoint: &str) {
+    let mut breakers = BREAKERS.lock().unwrap();
+    breakers.remove(endpoint);
+}
+
+/// Record a failed call, opening the circuit once the threshold is reached.
+pub fn record_failure(endpoint: &str) {
+    let mut breakers = BREAKERS.lock().unwrap();
+    let state = breakers.entry(endpoint.to_string()).or_default();
+    state.failures += 1;
+    state.trial_in_flight = false;
+
+    if state.failures >= FAILURE_THRESHOLD {
+        state.open_until = Some(Instant::now() + COOLDOWN);
+        warn!(
+            endpoint = %endpoint,
+            failures = state.failures,
+            cooldown_secs = COOLDOWN.as_secs(),
+            "Circuit opened for failing endpoint"
+        );
+    }
+}
+
+/// Release a trial call that ended without reaching the endpoint, so the
+/// next call becomes the trial instead of waiting out another cooldown.
+pub fn release_trial(endpoint: &str) {
+    let mut breakers = BREAKERS.lock().unwrap();
+    if let Some(state) = breakers.get_mut(endpoint)
+        && state.trial_in_flight
+    {
+        state.trial_in_flight = false;
+        state.open_until = Some(Instant::now());
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_half_open_lets_one_trial_call_through() {
+        let endpoint = "test|half-open";
+        for _ in 0..FAILURE_THRESHOLD {
+            record_failure(endpoint);
+        }
+        assert!(check(endpoint).is_err());
+
+        // Expire the cooldown
+        BREAKERS
+            .lock()
+            .unwrap()
+            .get_mut(endpoint)
+            .unwrap()
+            .open_until = Some(Instant::now());
+        assert!(check(endpoint).is_ok());
+        assert!(check(endpoint).is_err());
+
+        record_success(endpoint);
+        assert!(check(endpoint).is_ok());
+    }
+
+    #[test]
+    fn test_released_trial_lets_next_call_through() {
+        let endpoint = "test|released-trial";
+        for _ in 0..FAILURE_THRESHOLD {
+            record_failure(endpoint);
+        }
+
+        // Expire the cooldown
+        BREAKERS
+            .lock()
+            .unwrap()
+            .get_mut(endpoint)
+            .unwrap()
+            .open_until = Some(Instant::now());
+        assert!(check(endpoint).is_ok());
+        assert!(check(endpoint).is_err());
+
+        release_trial(endpoint);
+        assert!(check(endpoint).is_ok());
+        assert!(check(endpoint).is_err());
+    }
+}
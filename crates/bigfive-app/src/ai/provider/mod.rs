@@ -2,9 +2,14 @@
 //!
 //! Uses llm-relay for all LLM calls.
 
+mod breaker;
+
+use std::collections::HashMap;
+use std::sync::{Arc, LazyLock, Mutex};
 use std::time::{Duration, Instant};
 
 use llm_relay::{ChatOptions, ClientConfig, LlmClient};
+use tokio::sync::Semaphore;
 use tracing::{debug, info, instrument, warn};
 
 use crate::config::{ApiConfig, Provider, ThinkingConfig};
@@ -14,31 +19,39 @@ use super::error::AnalysisError;
 /// Default timeout for API calls (3 minutes to allow for slow Claude Opus responses).
 pub const API_TIMEOUT: Duration = Duration::from_secs(180);
 
-/// Call an AI model with the given prompt.
-#[instrument(skip(api, prompt), fields(model = %model, max_tokens = %max_tokens, provider = ?api.provider))]
-pub async fn call_model(
-    api: &ApiConfig,
-    model: &str,
-    prompt: &str,
-    max_tokens: u32,
-    thinking: Option<&ThinkingConfig>,
-) -> Result<String, AnalysisError> {
-    debug!(prompt_len = prompt.len(), "Calling model");
-    let start = Instant::now();
-    let result = do_call(api, model, None, prompt, max_tokens, thinking).await;
-    let elapsed = start.elapsed();
-    match &result {
-        Ok(response) => info!(
-            response_len = response.len(),
-            elapsed_ms = elapsed.as_millis(),
-            "Model call succeeded"
-        ),
-        Err(e) => warn!(error = %e, elapsed_ms = elapsed.as_millis(), "Model call failed"),
-    }
-    result
-}
+/// Maximum number of retries for transient failures (429/5xx, network errors).
+const MAX_RETRIES: u32 = 3;
+
+/// Base delay for exponential backoff between retries.
+const RETRY_BASE_DELAY: Duration = Duration::from_secs(1);
+
+/// Upper bound for a single backoff delay.
+const RETRY_MAX_DELAY: Duration = Duration::from_secs(30);
+
+/// Time since the first attempt after which failures are no longer retried.
+///
+/// Kept well inside the frontend's 180s polling window. A timed-out attempt
+/// alone takes `API_TIMEOUT`, so timeouts are never retried.
+const RETRY_WINDOW: Duration = Duration::from_secs(60);
+
+/// How long a call may wait for a free slot before failing fast.
+const CALL_SLOT_TIMEOUT: Duration = Duration::from_secs(30);
+
+/// Permits bounding concurrent calls per endpoint (keyed like the circuit
+/// breaker); extra calls wait for a free slot. A saturated endpoint does not
+/// hold up calls to other providers or models.
+static CALL_PERMITS: LazyLock<Mutex<HashMap<String, Arc<Semaphore>>>> =
+    LazyLock::new(|| Mutex::new(HashMap::new()));
+
+/// Clients reused across calls, so each endpoint keeps its connection pool
+/// (and TLS sessions) warm instead of reconnecting for every request.
+static CLIENTS: LazyLock<Mutex<HashMap<String, Arc<LlmClient>>>> =
+    LazyLock::new(|| Mutex::new(HashMap::new()));
 
 /// Call an AI model with system and user messages.
+///
+/// The single entry point for model calls: adds timing and logging around
+/// the retried request.
 #[instrument(skip(api, system, user), fields(model = %model, max_tokens = %max_tokens, provider = ?api.provider))]
 pub async fn call_model_with_system(
     api: &ApiConfig,
@@ -51,10 +64,11 @@ pub async fn call_model_with_system(
     debug!(
         system_len = system.len(),
         user_len = user.len(),
-        "Calling model with system prompt"
+        "Calling model"
     );
+
     let start = Instant::now();
-    let result = do_call(api, model, Some(system), user, max_tokens, thinking).await;
+    let result = call_with_retry(api, model, Some(system), user, max_tokens, thinking).await;
     let elapsed = start.elapsed();
     match &result {
         Ok(response) => info!(
@@ -67,7 +81,14 @@ pub async fn call_model_with_system(
     result
 }
 
-async fn do_call(
+/// Call the model, retrying transient failures with exponential backoff.
+///
+/// Retries stop once the next attempt would start after `RETRY_WINDOW`.
+///
+/// Calls that still fail after all retries count towards the endpoint's
+/// circuit breaker; while it is open, calls fail fast. Any other answer from
+/// the endpoint counts as a success.
+async fn call_with_retry(
     api: &ApiConfig,
     model: &str,
     system: Option<&str>,
@@ -75,6 +96,76 @@ async fn do_call(
     max_tokens: u32,
     thinking: Option<&ThinkingConfig>,
 ) -> Result<String, AnalysisError> {
+    let endpoint = breaker::endpoint_key(api, model);
+    breaker::check(&endpoint)?;
+
+    let start = Instant::now();
+    let mut attempt = 0;
+    let result = loop {
+        let delay = backoff_delay(attempt);
+        match do_call(api, model, &endpoint, system, user, max_tokens, thinking).await {
+            Err(e)
+                if e.is_retryable()
+                    && attempt < MAX_RETRIES
+                    && start.elapsed() + delay < RETRY_WINDOW =>
+            {
+                attempt += 1;
+                warn!(
+                    error = %e,
+                    attempt,
+                    delay_ms = delay.as_millis(),
+                    "Transient API error, retrying"
+                );
+                tokio::time::sleep(delay).await;
+            }
+            result => break result,
+        }
+    };
+
+    match &result {
+        Ok(_) => breaker::record_success(&endpoint),
+        Err(e) if e.is_retryable() => breaker::record_failure(&endpoint),
+        // The endpoint answered, just not with a usable response
+        Err(
+            AnalysisError::ApiError { .. }
+            | AnalysisError::EmptyResponse
+            | AnalysisError::ParseResponse(_),
+        ) => breaker::record_success(&endpoint),
+        // The call never reached the endpoint (no free slot, missing key)
+        Err(_) => breaker::release_trial(&endpoint),
+    }
+    result
+}
+
+/// Exponential backoff delay for the given attempt, with up to 50% jitter.
+fn backoff_delay(attempt: u32) -> Duration {
+    let base = RETRY_BASE_DELAY
+        .saturating_mul(1 << attempt.min(16))
+        .min(RETRY_MAX_DELAY);
+    let jitter_permille = getrandom::u32().unwrap_or(0) % 500;
+    base + base * jitter_permille / 1000
+}
+
+/// Get a cached client for the given API and model, creating it on first use.
+fn get_client(
+    api: &ApiConfig,
+    model: &str,
+    max_tokens: u32,
+) -> Result<Arc<LlmClient>, AnalysisError> {
+    let key = format!(
+        "{:?}|{}|{}|{}|{}",
+        api.provider,
+        api.api_url.as_deref().unwrap_or_default(),
+        api.api_key_env,
+        model,
+        max_tokens
+    );
+
+    let mut clients = CLIENTS.lock().unwrap();
+    if let Some(client) = clients.get(&key) {
+        return Ok(Arc::clone(client));
+    }
+
     let api_key = api.api_key()?;
     let config = match api.provider {
         Provider::Anthropic => ClientConfig::anthropic(&api_key, model),
@@ -88,7 +179,41 @@ async fn do_call(
         }
     };
     let config = config.max_tokens(max_tokens).timeout(API_TIMEOUT);
-    let client = LlmClient::new(config).map_err(|e| AnalysisError::Request(e.to_string()))?;
+    let client =
+        Arc::new(LlmClient::new(config).map_err(|e| AnalysisError::Request(e.to_string()))?);
+    debug!(model = %model, "Created API client");
+    clients.insert(key, Arc::clone(&client));
+    Ok(client)
+}
+
+/// Get the call permits for an endpoint, creating them on first use.
+fn call_permits(endpoint: &str, limit: usize) -> Arc<Semaphore> {
+    let mut permits = CALL_PERMITS.lock().unwrap();
+    let semaphore = permits
+        .entry(endpoint.to_string())
+        .or_insert_with(|| Arc::new(Semaphore::new(limit)));
+    Arc::clone(semaphore)
+}
+
+async fn do_call(
+    api: &ApiConfig,
+    model: &str,
+    endpoint: &str,
+    system: Option<&str>,
+    user: &str,
+    max_tokens: u32,
+    thinking: Option<&ThinkingConfig>,
+) -> Result<String, AnalysisError> {
+    let client = get_client(api, model, max_tokens)?;
+    let permits = call_permits(endpoint, api.max_concurrent_calls);
+    // Held only for this attempt, so retry backoff does not occupy a slot
+    let _permit = tokio::time::timeout(CALL_SLOT_TIMEOUT, permits.acquire())
+        .await
+        .map_err(|_| {
+            warn!(endpoint = %endpoint, "No free model call slot, rejecting call");
+            AnalysisError::ServiceUnavailable
+        })?
+        .map_err(|e| AnalysisError::Request(e.to_string()))?;
     let options = ChatOptions {
         system,
         thinking,
@@ -102,3 +227,25 @@ async fn do_call(
     })?;
     Ok(resp.text())
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_backoff_delay_grows_exponentially() {
+        for attempt in 0..3 {
+            let base = RETRY_BASE_DELAY * (1 << attempt);
+            let delay = backoff_delay(attempt);
+            assert!(delay >= base && delay < base * 3 / 2);
+        }
+    }
+
+    #[test]
+    fn test_backoff_delay_is_capped() {
+        for attempt in [5, 16, 31, u32::MAX] {
+            let delay = backoff_delay(attempt);
+            assert!(delay >= RETRY_MAX_DELAY && delay < RETRY_MAX_DELAY * 3 / 2);
+        }
+    }
+}
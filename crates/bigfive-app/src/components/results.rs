@@ -24,6 +24,15 @@ const POLL_INTERVAL_MS: u32 = 3000;
 #[cfg(target_arch = "wasm32")]
 const MAX_POLL_ATTEMPTS: u32 = 60;
 
+/// Maximum length of the optional user context, in characters
+const MAX_CONTEXT_CHARS: usize = 2000;
+
+/// Whether the user context is longer than `MAX_CONTEXT_CHARS`.
+#[cfg(feature = "ssr")]
+fn context_too_long(context: Option<&str>) -> bool {
+    context.is_some_and(|context| context.chars().count() > MAX_CONTEXT_CHARS)
+}
+
 /// Status of a background analysis job (shared between server and client)
 #[derive(Clone, Debug, Serialize, Deserialize, PartialEq)]
 pub enum AnalysisStatus {
@@ -59,9 +68,11 @@ pub async fn get_available_models() -> Result<Vec<ClientModelInfo>, ServerFnErro
     use crate::config::get_config;
 
     let config = get_config().map_err(|e| ServerFnError::new(e.to_string()))?;
+    // Hide presets whose API key is not set; they would only fail on use
     Ok(config
         .models
         .iter()
+        .filter(|m| m.api.api_key().is_ok())
         .map(|m| ClientModelInfo {
             id: m.id.clone(),
             display_name: m.display_name.clone(),
@@ -134,10 +145,22 @@ pub async fn start_analysis(
     user_context: Option<String>,
     model_id: String,
 ) -> Result<String, ServerFnError> {
+    use crate::ai;
     use crate::jobs::{self, JobStatus};
 
-    // Load .env file for local development
-    dotenvy::dotenv().ok();
+    // Reject oversized context before it reaches any model
+    if context_too_long(user_context.as_deref()) {
+        return Err(ServerFnError::new(format!(
+            "Context is too long (max {MAX_CONTEXT_CHARS} characters)"
+        )));
+    }
+
+    // Fail fast on unknown models or missing API keys before spawning the job
+    let has_context = user_context
+        .as_deref()
+        .is_some_and(|context| !context.trim().is_empty());
+    ai::validate_model(&model_id, &lang, has_context)
+        .map_err(|e| ServerFnError::new(e.to_string()))?;
 
     // Generate job ID and create job entry
     let job_id = jobs::generate_job_id();
@@ -156,8 +179,6 @@ pub async fn start_analysis(
 
     // Spawn background task
     tokio::spawn(async move {
-        use crate::ai;
-
         let start = std::time::Instant::now();
         jobs::update_job_status(&job_id_clone, JobStatus::Processing);
 
@@ -825,6 +846,7 @@ pub fn ResultsPage() -> impl IntoView {
                                             <textarea
                                                 class="w-full px-4 py-3 border border-gray-300 dark:border-gray-600 bg-white dark:bg-gray-700 rounded-lg focus:ring-2 focus:ring-indigo-500 focus:border-indigo-500 resize-none text-gray-700 dark:text-gray-200 placeholder:text-gray-400 dark:placeholder:text-gray-500"
                                                 rows="3"
+                                                maxlength=MAX_CONTEXT_CHARS.to_string()
                                                 placeholder=i18n.t("results_context_placeholder")
                                                 prop:value=move || user_context.get()
                                                 on:input=move |ev| {
@@ -1018,3 +1040,17 @@ fn save_context(context: &str) {
         let _ = context;
     }
 }
+
+#[cfg(all(test, feature = "ssr"))]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_context_too_long() {
+        assert!(!context_too_long(None));
+        assert!(!context_too_long(Some(&"a".repeat(MAX_CONTEXT_CHARS))));
+        assert!(context_too_long(Some(&"a".repeat(MAX_CONTEXT_CHARS + 1))));
+        // Counted in characters, not bytes
+        assert!(!context_too_long(Some(&"я".repeat(MAX_CONTEXT_CHARS))));
+    }
+}
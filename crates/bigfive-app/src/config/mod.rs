@@ -125,6 +125,10 @@ pub struct ApiConfig {
 
     /// API endpoint URL (required for OpenAI-compatible providers)
     pub api_url: Option<String>,
+
+    /// Maximum concurrent calls to each model on this endpoint
+    #[serde(default = "default_max_concurrent_calls")]
+    pub max_concurrent_calls: usize,
 }
 
 impl ApiConfig {
@@ -135,6 +139,11 @@ impl ApiConfig {
                 "[{section}] api_url is required for 'openai' provider"
             )));
         }
+        if self.max_concurrent_calls == 0 {
+            return Err(ConfigError::Validation(format!(
+                "[{section}] max_concurrent_calls must be at least 1"
+            )));
+        }
         Ok(())
     }
 
@@ -226,9 +235,10 @@ pub struct TranslationConfig {
     /// Model to use for translation
     pub model: String,
 
-    /// Maximum tokens for translation response
-    #[serde(default = "default_translation_max_tokens")]
-    pub max_tokens: u32,
+    /// Maximum tokens for translation response (defaults to an estimate from the
+    /// analysis length, capped at the preset's `max_tokens`)
+    #[serde(default)]
+    pub max_tokens: Option<u32>,
 
     /// API configuration for translation
     pub api: ApiConfig,
@@ -293,6 +303,6 @@ fn default_analysis_max_tokens() -> u32 {
     8192
 }
 
-fn default_translation_max_tokens() -> u32 {
-    8192
+fn default_max_concurrent_calls() -> usize {
+    8
 }
@@ -28,7 +28,9 @@ pub struct SavedResult {
 pub async fn init_database(path: &str) -> Result<()> {
     // Ensure directory exists
     if let Some(parent) = std::path::Path::new(path).parent() {
-        std::fs::create_dir_all(parent).context("Failed to create database directory")?;
+        tokio::fs::create_dir_all(parent)
+            .await
+            .context("Failed to create database directory")?;
     }
 
     let db = Builder::new_local(path)
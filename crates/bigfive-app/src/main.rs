@@ -60,6 +60,12 @@ async fn main() {
                     default_marker,
                     preset.source_lang
                 );
+                if preset.api.api_key().is_err() {
+                    tracing::warn!(
+                        "      {} not set, hiding this model",
+                        preset.api.api_key_env
+                    );
+                }
             }
             if let Some(ref safeguard) = config.safeguard {
                 if safeguard.enabled {
@@ -104,10 +110,9 @@ async fn main() {
 
     // Logging middleware that captures real IP
     async fn log_request(req: Request, next: Next) -> impl IntoResponse {
+        // Log by reference before handing the request on; no per-request clones
         let ip = req.extensions().get::<RealIp>().map(|r| r.0);
-        let method = req.method().clone();
-        let uri = req.uri().clone();
-        tracing::info!(%method, %uri, ?ip, "request");
+        tracing::info!(method = %req.method(), uri = %req.uri(), ?ip, "request");
         next.run(req).await
     }
 
@@ -397,3 +397,21 @@ impl PersonalityProfile {
             .and_then(|d| d.facets.iter().find(|f| f.facet == facet))
     }
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_facets_unique_across_domains() {
+        let mut seen = std::collections::HashSet::new();
+        for domain in Domain::all() {
+            for (i, facet) in domain.facets().iter().enumerate() {
+                assert!(seen.insert(*facet), "Facet {:?} listed twice", facet);
+                assert_eq!(facet.domain(), *domain);
+                assert_eq!(facet.index() as usize, i + 1);
+            }
+        }
+        assert_eq!(seen.len(), 30);
+    }
+}